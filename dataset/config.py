@@ -8,6 +8,7 @@ NUM_REGIONS = 8  # Geographic regions for clustering
 MIN_INTERESTS_PER_USER = 2
 MAX_INTERESTS_PER_USER = 5
 TOTAL_INTEREST_CATEGORIES = 20
+SEED = None  # Random seed for all generators (None = nondeterministic)
 
 # Connection probabilities
 BASE_CONNECTION_PROB = 0.02  # Base probability of connection
@@ -50,5 +51,8 @@ ACCOUNT_CREATION_END_DAYS_BEFORE = 0  # Some accounts created on start date
 # Export settings
 EXPORT_JSON = True
 EXPORT_CSV = False
+EXPORT_PARQUET = False  # Aggregated Parquet files (requires pyarrow)
+EXPORT_IN_BACKGROUND = False  # Overlap JSON writing with evolution (faster, but buffers whole snapshots in memory)
+PRETTY_JSON = False  # Indent JSON snapshots (larger and slower to write)
 OUTPUT_DIR = "data/generated"
 
@@ -4,30 +4,45 @@ Geographic and interest-based clustering for realistic social network generation
 
 import random
 import math
-from typing import List, Set, Tuple
+import numpy as np
+from typing import List, Set, Tuple, Union
 
 
 class ClusteringManager:
     """Manages geographic and interest-based clustering."""
     
-    def __init__(self, num_regions: int, total_interests: int):
+    def __init__(
+        self,
+        num_regions: int,
+        total_interests: int,
+        seed: Union[int, np.random.SeedSequence] = None
+    ):
         """
         Initialize clustering manager.
         
         Args:
             num_regions: Number of geographic regions
             total_interests: Total number of interest categories
+            seed: Random seed or seed sequence (None = nondeterministic)
         """
+        # Private generators: avoid the shared module-level instance and
+        # make locations/interests reproducible from a seed. Each gets its
+        # own child sequence so the two never mirror each other
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        python_seed, numpy_seed = seed.spawn(2)
+        self._rand = random.Random(int(python_seed.generate_state(1)[0]))
+        self._np_rng = np.random.default_rng(numpy_seed)
         self.num_regions = num_regions
         self.total_interests = total_interests
-        self.interest_pool = [f"interest_{i}" for i in range(total_interests)]
+        self.interest_pool = tuple(f"interest_{i}" for i in range(total_interests))
         
         # Create region centers once (these represent "cities" or "regions")
         # Each region has a center point (lat, lon) that users cluster around
-        self.region_centers = [
-            (random.uniform(-90, 90), random.uniform(-180, 180))
+        self.region_centers = tuple(
+            (self._rand.uniform(-90, 90), self._rand.uniform(-180, 180))
             for _ in range(num_regions)
-        ]
+        )
         
     def assign_location(self) -> Tuple[float, float, int]:
         """
@@ -42,7 +57,7 @@ class ClusteringManager:
             Tuple of (latitude, longitude, region_id)
         """
         # Randomly assign user to one of the regions
-        region_id = random.randint(0, self.num_regions - 1)
+        region_id = self._rand.randint(0, self.num_regions - 1)
         
         # Get the center point for this region
         # center_lat and center_lon are the "center" coordinates of the region
@@ -54,8 +69,8 @@ class ClusteringManager:
         # This creates a "cloud" of users around each region center
         # random.gauss(0, 10) means: mean=0, std_dev=10 degrees
         # So users will be within roughly 10-20 degrees of the center
-        lat = center_lat + random.gauss(0, 10)  # ~10 degree spread
-        lon = center_lon + random.gauss(0, 10)
+        lat = center_lat + self._rand.gauss(0, 10)  # ~10 degree spread
+        lon = center_lon + self._rand.gauss(0, 10)
         
         # Clamp to valid ranges (latitude: -90 to 90, longitude: -180 to 180)
         lat = max(-90, min(90, lat))
@@ -63,6 +78,30 @@ class ClusteringManager:
         
         return (lat, lon, region_id)
     
+    def assign_locations(self, count: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Assign geographic locations to a batch of users.
+        
+        Vectorized version of assign_location: users are clustered around
+        the same region centers, but all draws happen in a few array calls.
+        
+        Args:
+            count: Number of users
+            
+        Returns:
+            Tuple of (latitudes, longitudes, region_ids) arrays
+        """
+        region_ids = self._np_rng.integers(0, self.num_regions, size=count)
+        centers = np.asarray(self.region_centers)
+        
+        # Same ~10 degree spread around each center, clamped to valid ranges
+        lats = centers[region_ids, 0] + self._np_rng.normal(0, 10, size=count)
+        lons = centers[region_ids, 1] + self._np_rng.normal(0, 10, size=count)
+        np.clip(lats, -90, 90, out=lats)
+        np.clip(lons, -180, 180, out=lons)
+        
+        return (lats, lons, region_ids)
+    
     def assign_interests(self, min_interests: int, max_interests: int) -> Set[str]:
         """
         Assign interests to a user.
@@ -74,8 +113,8 @@ class ClusteringManager:
         Returns:
             Set of interest strings
         """
-        num_interests = random.randint(min_interests, max_interests)
-        interests = set(random.sample(self.interest_pool, num_interests))
+        num_interests = self._rand.randint(min_interests, max_interests)
+        interests = set(self._rand.sample(self.interest_pool, num_interests))
         return interests
     
     def calculate_geographic_similarity(self, region1: int, region2: int) -> float:
@@ -93,6 +132,35 @@ class ClusteringManager:
             return 1.0
         return 0.0
     
+    def assign_interests_batch(
+        self,
+        count: int,
+        min_interests: int,
+        max_interests: int
+    ) -> np.ndarray:
+        """
+        Assign interests to a batch of users.
+        
+        Vectorized version of assign_interests: each user gets a uniform
+        number of distinct interests, chosen uniformly from the pool.
+        
+        Args:
+            count: Number of users
+            min_interests: Minimum number of interests
+            max_interests: Maximum number of interests
+            
+        Returns:
+            Boolean matrix of shape (count, total_interests); column i marks
+            interest_pool[i]
+        """
+        num_interests = self._np_rng.integers(min_interests, max_interests + 1, size=count)
+        
+        # Rank interests per user by a random key and keep the first k:
+        # a uniform k-subset without a per-user sampling loop
+        keys = self._np_rng.random((count, self.total_interests))
+        ranks = keys.argsort(axis=1).argsort(axis=1)
+        return ranks < num_interests[:, None]
+    
     def calculate_interest_similarity(self, interests1: Set[str], interests2: Set[str]) -> float:
         """
         Calculate interest overlap similarity.
@@ -145,8 +213,8 @@ class ClusteringManager:
         """
         prob = base_prob
         
-        # Geographic boost
-        if self.calculate_geographic_similarity(region1, region2) > 0:
+        # Geographic boost (same region, as in calculate_geographic_similarity)
+        if region1 == region2:
             prob += geo_boost
         
         # Interest boost
@@ -156,4 +224,61 @@ class ClusteringManager:
         
         # Clamp to [0, 1]
         return min(1.0, max(0.0, prob))
-
+    
+    def score_all_pairs(
+        self,
+        regions: np.ndarray,
+        bits: np.ndarray,
+        base_prob: float,
+        geo_boost: float,
+        interest_boost: float,
+        max_interest_boost: float,
+        rows: slice = slice(None),
+        interest_counts: np.ndarray = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calculate connection probabilities for many user pairs at once.
+        
+        Vectorized version of calculate_connection_probability, scoring the
+        selected source users against every user.
+        
+        Args:
+            regions: Region ID of every user
+            bits: float32 interest flag matrix of shape (users, total_interests)
+            base_prob: Base connection probability
+            geo_boost: Geographic boost value
+            interest_boost: Interest boost per shared interest
+            max_interest_boost: Maximum boost from interests
+            rows: Source users to score (default: all)
+            interest_counts: Number of interests of every user (row sums of
+                bits); pass it when scoring in blocks to compute it once
+            
+        Returns:
+            Tuple of (probability, same_region, interest_similarity) matrices
+            of shape (selected users, users); the similarities are returned
+            for callers that reuse them
+        """
+        # Geographic similarity (same region)
+        same_region = regions[rows, None] == regions[None, :]
+        
+        # Jaccard similarity of interests; the float32 matmul runs through BLAS
+        # and |A | B| = |A| + |B| - |A & B| avoids a second pairwise pass
+        if interest_counts is None:
+            interest_counts = bits.sum(axis=1)
+        overlap = bits[rows] @ bits.T
+        union = interest_counts[rows, None] + interest_counts[None, :] - overlap
+        interest_sim = np.divide(
+            overlap, union,
+            out=np.zeros(overlap.shape, dtype=np.float32),
+            where=union > 0
+        )
+        del overlap, union
+        
+        # Buffers are float32 and updated in place to limit memory traffic
+        prob = interest_sim * np.float32(interest_boost * 10)
+        np.minimum(prob, max_interest_boost, out=prob)
+        prob += base_prob
+        np.add(prob, geo_boost, out=prob, where=same_region)
+        np.clip(prob, 0.0, 1.0, out=prob)
+        
+        return prob, same_region, interest_sim
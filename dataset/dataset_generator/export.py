@@ -1,15 +1,77 @@
 """
-Export module for saving graph data to JSON and CSV formats.
+Export module for saving graph data to JSON, CSV and Parquet formats.
 """
 
 import networkx as nx
-import json
+import orjson
 import csv
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
 from datetime import datetime
-from typing import Dict, List
+from typing import Callable, Dict, Iterable, Iterator, Tuple
 import config
-from dataset_generator.relationship_manager import RelationshipManager
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+STREAM_BUFFER_SIZE = 256 * 1024
+STREAM_CHUNK_ITEMS = 4096
+CSV_BUFFER_SIZE = 1 << 20
+
+NODE_CSV_FIELDS = (
+    'user_id', 'name', 'date', 'location_lat', 'location_lon',
+    'region_id', 'interests', 'created_at'
+)
+EDGE_CSV_FIELDS = (
+    'date', 'source', 'target', 'relationship_type', 'message_count',
+    'last_interaction', 'distance', 'established_at'
+)
+PARQUET_COMPRESSION = 'zstd'
+
+
+def _json_options() -> int:
+    """Return orjson options for snapshot files (indented if config.PRETTY_JSON)."""
+    if config.PRETTY_JSON:
+        return JSON_OPTIONS | orjson.OPT_INDENT_2
+    return JSON_OPTIONS
+
+
+def _stream_json_array(
+    path: str,
+    iterable: Iterable,
+    encode: Callable[[object], bytes]
+) -> None:
+    """
+    Write items as a JSON array without building the full list in memory.
+    
+    Args:
+        path: Output file path
+        iterable: Items to write, consumed lazily
+        encode: Function encoding one item to JSON bytes
+    """
+    items = iter(iterable)
+    with open(path, 'wb', buffering=STREAM_BUFFER_SIZE) as f:
+        f.write(b'[\n')
+        
+        # Encode and join items a chunk at a time: one write per chunk
+        # instead of two per item, with memory bounded by the chunk size
+        separator = b''
+        while True:
+            chunk = list(map(encode, islice(items, STREAM_CHUNK_ITEMS)))
+            if not chunk:
+                break
+            f.write(separator)
+            f.write(b',\n'.join(chunk))
+            separator = b',\n'
+        f.write(b'\n]')
 
 
 class DataExporter:
@@ -24,12 +86,26 @@ class DataExporter:
         """
         self.output_dir = output_dir or config.OUTPUT_DIR
         os.makedirs(self.output_dir, exist_ok=True)
+        
+        # Background snapshot writer (see export_daily_snapshot)
+        self._executor = None
+        self._pending_snapshot = None
+        
+        # Aggregated CSV writers (see open_aggregated_csv)
+        self._csv_files = []
+        self._nodes_csv = None
+        self._edges_csv = None
+        
+        # Aggregated Parquet writers (see open_aggregated_parquet)
+        self._nodes_parquet = None
+        self._edges_parquet = None
     
     def export_daily_snapshot(
         self,
         graph: nx.DiGraph,
         date: datetime,
-        snapshot_dir: str = None
+        snapshot_dir: str = None,
+        background: bool = False
     ) -> Dict[str, str]:
         """
         Export daily snapshot of graph.
@@ -38,6 +114,9 @@ class DataExporter:
             graph: Graph to export
             date: Date of snapshot
             snapshot_dir: Subdirectory for this snapshot (defaults to date)
+            background: Write the files on a background thread so the caller
+                can keep evolving the graph; call wait_for_snapshots() before
+                relying on the files
             
         Returns:
             Dictionary with paths to exported files
@@ -48,12 +127,92 @@ class DataExporter:
         snapshot_path = os.path.join(self.output_dir, snapshot_dir)
         os.makedirs(snapshot_path, exist_ok=True)
         
-        exported_files = {}
+        exported_files = {
+            'nodes': os.path.join(snapshot_path, 'nodes.json'),
+            'edges': os.path.join(snapshot_path, 'edges.json'),
+            'metadata': os.path.join(snapshot_path, 'metadata.json')
+        }
+        
+        metadata = self._snapshot_metadata(graph, date)
+        node_records = self._node_records(graph)
+        edge_records = self._edge_records(graph)
+        
+        if background:
+            # The graph keeps changing after we return, so capture this
+            # day's records now and only hand the writing to the thread
+            node_records = list(node_records)
+            edge_records = list(edge_records)
+            
+            # Keep at most one snapshot in flight to bound memory
+            self._wait_for_pending_snapshot()
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1)
+            self._pending_snapshot = self._executor.submit(
+                self._write_snapshot, exported_files, node_records, edge_records, metadata
+            )
+        else:
+            self._write_snapshot(exported_files, node_records, edge_records, metadata)
         
-        # Export nodes
-        nodes_data = []
+        return exported_files
+    
+    def wait_for_snapshots(self) -> None:
+        """Block until all background snapshots are written and stop the writer thread."""
+        self._wait_for_pending_snapshot()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+    
+    def _wait_for_pending_snapshot(self) -> None:
+        """Wait for the in-flight background snapshot, re-raising its errors."""
+        if self._pending_snapshot is not None:
+            pending, self._pending_snapshot = self._pending_snapshot, None
+            pending.result()
+    
+    def _write_snapshot(
+        self,
+        exported_files: Dict[str, str],
+        node_records: Iterable[Dict],
+        edge_records: Iterable[Dict],
+        metadata: Dict
+    ) -> None:
+        """Write one snapshot's nodes, edges and metadata files."""
+        options = _json_options()
+        encode = partial(orjson.dumps, option=options)
+        
+        _stream_json_array(exported_files['nodes'], node_records, encode)
+        _stream_json_array(exported_files['edges'], edge_records, encode)
+        
+        with open(exported_files['metadata'], 'wb') as f:
+            f.write(orjson.dumps(metadata, option=options))
+    
+    def _snapshot_metadata(self, graph: nx.DiGraph, date: datetime) -> Dict:
+        """Compute summary statistics for a snapshot."""
+        # Each friend pair has two edges, each fan relationship is a single
+        # edge. Classify from adjacency so the counts always match the edges,
+        # even if the cached edge types are stale or not set yet
+        succ = graph._succ
+        friend_edges = sum(
+            1 for node1, node2 in graph.edges()
+            if node1 in succ[node2]
+        )
+        friend_count = friend_edges // 2
+        fan_count = graph.number_of_edges() - 2 * friend_count
+        num_nodes = graph.number_of_nodes()
+        
+        return {
+            'date': date.isoformat(),
+            'total_nodes': num_nodes,
+            'total_edges': graph.number_of_edges(),
+            'friend_relationships': friend_count,
+            'fan_relationships': fan_count,
+            # Sum of in- and out-degrees is twice the edge count
+            'average_degree': 2 * graph.number_of_edges() / num_nodes if num_nodes > 0 else 0
+        }
+    
+    def _node_records(self, graph: nx.DiGraph) -> Iterator[Dict]:
+        """Yield export records for all nodes."""
         for node_id, node_data in graph.nodes(data=True):
-            node_export = {
+            yield {
                 'user_id': node_id,
                 'name': node_data.get('name', ''),
                 'location': node_data.get('location', (0, 0)),
@@ -61,17 +220,11 @@ class DataExporter:
                 'interests': node_data.get('interests', []),
                 'created_at': node_data.get('created_at', '')
             }
-            nodes_data.append(node_export)
-        
-        nodes_file = os.path.join(snapshot_path, 'nodes.json')
-        with open(nodes_file, 'w') as f:
-            json.dump(nodes_data, f, indent=2)
-        exported_files['nodes'] = nodes_file
-        
-        # Export edges
-        edges_data = []
+    
+    def _edge_records(self, graph: nx.DiGraph) -> Iterator[Dict]:
+        """Yield export records for all edges."""
         for source, target, edge_data in graph.edges(data=True):
-            edge_export = {
+            yield {
                 'source': source,
                 'target': target,
                 'relationship_type': edge_data.get('relationship_type', 'fan'),
@@ -80,90 +233,158 @@ class DataExporter:
                 'distance': edge_data.get('distance', 0.0),
                 'established_at': edge_data.get('established_at', '')
             }
-            edges_data.append(edge_export)
-        
-        edges_file = os.path.join(snapshot_path, 'edges.json')
-        with open(edges_file, 'w') as f:
-            json.dump(edges_data, f, indent=2)
-        exported_files['edges'] = edges_file
-        
-        # Export metadata
-        relationship_manager = RelationshipManager(graph)
-        friend_pairs = set()
-        fan_count = 0
-        
-        # Count unique friend relationships (each pair counted once)
-        # and fan relationships (one-way edges)
-        for edge in graph.edges():
-            node1, node2 = edge
-            rel_type = relationship_manager.get_relationship_type(node1, node2)
-            if rel_type == "friend":
-                # Store as tuple with smaller ID first to avoid duplicates
-                pair = tuple(sorted([node1, node2]))
-                friend_pairs.add(pair)
-            elif rel_type == "fan":
-                fan_count += 1
-        
-        friend_count = len(friend_pairs)
-        
-        metadata = {
-            'date': date.isoformat(),
-            'total_nodes': graph.number_of_nodes(),
-            'total_edges': graph.number_of_edges(),
-            'friend_relationships': friend_count,
-            'fan_relationships': fan_count,
-            'average_degree': sum(dict(graph.degree()).values()) / graph.number_of_nodes() if graph.number_of_nodes() > 0 else 0
-        }
-        
-        metadata_file = os.path.join(snapshot_path, 'metadata.json')
-        with open(metadata_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
-        exported_files['metadata'] = metadata_file
-        
-        return exported_files
     
-    def export_aggregated_csv(
+    def open_aggregated_csv(
         self,
-        all_nodes: List[Dict],
-        all_edges: List[Dict],
         nodes_file: str = None,
         edges_file: str = None
     ) -> Dict[str, str]:
         """
-        Export aggregated data to CSV files.
+        Open the aggregated CSV files and write their headers.
+        
+        Daily rows are then appended with append_daily_csv, so the full
+        multi-day dataset never has to be held in memory.
         
         Args:
-            all_nodes: List of all node dictionaries across all days
-            all_edges: List of all edge dictionaries across all days
             nodes_file: Output file for nodes CSV
             edges_file: Output file for edges CSV
             
         Returns:
-            Dictionary with paths to exported files
+            Dictionary with paths to the opened files
         """
-        exported_files = {}
-        
-        # Export nodes CSV
         if nodes_file is None:
             nodes_file = os.path.join(self.output_dir, 'nodes.csv')
+        if edges_file is None:
+            edges_file = os.path.join(self.output_dir, 'edges_daily.csv')
         
-        if all_nodes:
-            with open(nodes_file, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=all_nodes[0].keys())
-                writer.writeheader()
-                writer.writerows(all_nodes)
-            exported_files['nodes_csv'] = nodes_file
+        self._csv_files = [
+            open(nodes_file, 'w', newline='', buffering=CSV_BUFFER_SIZE),
+            open(edges_file, 'w', newline='', buffering=CSV_BUFFER_SIZE)
+        ]
+        self._nodes_csv = csv.writer(self._csv_files[0])
+        self._edges_csv = csv.writer(self._csv_files[1])
+        self._nodes_csv.writerow(NODE_CSV_FIELDS)
+        self._edges_csv.writerow(EDGE_CSV_FIELDS)
         
-        # Export edges CSV
+        return {'nodes_csv': nodes_file, 'edges_csv': edges_file}
+    
+    def append_daily_csv(self, graph: nx.DiGraph, date: datetime) -> None:
+        """
+        Append one day's nodes and edges to the aggregated CSV files.
+        
+        Args:
+            graph: Graph to export
+            date: Date of snapshot
+        """
+        date_iso = date.isoformat()
+        self._nodes_csv.writerows(self._node_csv_rows(graph, date_iso))
+        self._edges_csv.writerows(self._edge_csv_rows(graph, date_iso))
+    
+    def _node_csv_rows(self, graph: nx.DiGraph, date_iso: str) -> Iterator[Tuple]:
+        """Yield node CSV rows in NODE_CSV_FIELDS order."""
+        for node_id, node_data in graph.nodes(data=True):
+            lat, lon = node_data.get('location', (0, 0))
+            yield (
+                node_id,
+                node_data.get('name', ''),
+                date_iso,
+                lat,
+                lon,
+                node_data.get('region_id', 0),
+                ','.join(node_data.get('interests', [])),
+                node_data.get('created_at', '')
+            )
+    
+    def _edge_csv_rows(self, graph: nx.DiGraph, date_iso: str) -> Iterator[Tuple]:
+        """Yield edge CSV rows in EDGE_CSV_FIELDS order."""
+        for source, target, edge_data in graph.edges(data=True):
+            yield (
+                date_iso,
+                source,
+                target,
+                edge_data.get('relationship_type', 'fan'),
+                edge_data.get('message_count', 0),
+                edge_data.get('last_interaction', ''),
+                edge_data.get('distance', 0.0),
+                edge_data.get('established_at', '')
+            )
+    
+    def close_aggregated_csv(self) -> None:
+        """Flush and close the aggregated CSV files."""
+        for f in self._csv_files:
+            f.close()
+        self._csv_files = []
+        self._nodes_csv = None
+        self._edges_csv = None
+    
+    def open_aggregated_parquet(
+        self,
+        nodes_file: str = None,
+        edges_file: str = None
+    ) -> Dict[str, str]:
+        """
+        Open the aggregated Parquet files.
+        
+        Columns match the aggregated CSV files but keep their types; each
+        append_daily_parquet call writes one row group per file. Requires
+        pyarrow.
+        
+        Args:
+            nodes_file: Output file for nodes Parquet
+            edges_file: Output file for edges Parquet
+            
+        Returns:
+            Dictionary with paths to the opened files
+        """
+        if pq is None:
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+        
+        if nodes_file is None:
+            nodes_file = os.path.join(self.output_dir, 'nodes.parquet')
         if edges_file is None:
-            edges_file = os.path.join(self.output_dir, 'edges_daily.csv')
+            edges_file = os.path.join(self.output_dir, 'edges_daily.parquet')
         
-        if all_edges:
-            with open(edges_file, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=all_edges[0].keys())
-                writer.writeheader()
-                writer.writerows(all_edges)
-            exported_files['edges_csv'] = edges_file
+        node_schema = pa.schema(list(zip(NODE_CSV_FIELDS, (
+            pa.int64(), pa.string(), pa.string(), pa.float64(), pa.float64(),
+            pa.int64(), pa.string(), pa.string()
+        ))))
+        edge_schema = pa.schema(list(zip(EDGE_CSV_FIELDS, (
+            pa.string(), pa.int64(), pa.int64(), pa.string(), pa.int64(),
+            pa.string(), pa.float64(), pa.string()
+        ))))
+        self._nodes_parquet = pq.ParquetWriter(
+            nodes_file, node_schema, compression=PARQUET_COMPRESSION
+        )
+        self._edges_parquet = pq.ParquetWriter(
+            edges_file, edge_schema, compression=PARQUET_COMPRESSION
+        )
         
-        return exported_files
-
+        return {'nodes_parquet': nodes_file, 'edges_parquet': edges_file}
+    
+    def append_daily_parquet(self, graph: nx.DiGraph, date: datetime) -> None:
+        """
+        Append one day's nodes and edges to the aggregated Parquet files.
+        
+        Args:
+            graph: Graph to export
+            date: Date of snapshot
+        """
+        date_iso = date.isoformat()
+        self._write_parquet_rows(self._nodes_parquet, self._node_csv_rows(graph, date_iso))
+        self._write_parquet_rows(self._edges_parquet, self._edge_csv_rows(graph, date_iso))
+    
+    def _write_parquet_rows(self, writer, rows: Iterable[Tuple]) -> None:
+        """Transpose rows into columns and write them as one row group."""
+        columns = list(zip(*rows))
+        if columns:
+            writer.write_table(
+                pa.table(dict(zip(writer.schema.names, columns)), schema=writer.schema)
+            )
+    
+    def close_aggregated_parquet(self) -> None:
+        """Write the Parquet footers and close the files."""
+        for writer in (self._nodes_parquet, self._edges_parquet):
+            if writer is not None:
+                writer.close()
+        self._nodes_parquet = None
+        self._edges_parquet = None
@@ -3,18 +3,24 @@ Main graph generation logic for social media network.
 """
 
 import networkx as nx
-import random
+import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, Tuple, Set
+from typing import Dict, List, Tuple, Set
 import config
 from dataset_generator.clustering import ClusteringManager
+from dataset_generator.seeding import CLUSTERING_STREAM, GRAPH_GENERATOR_STREAM, component_seed
+
+
+# Pairwise entries scored per block during edge generation (~16 MB per
+# float32 buffer); bounds memory for large graphs
+EDGE_BLOCK_ELEMENTS = 1 << 22
 
 
 class GraphGenerator:
     """Generates the initial social network graph."""
     
     # Common first and last names for random name generation
-    FIRST_NAMES = [
+    FIRST_NAMES = (
         "Alex", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Avery", "Quinn",
         "Sam", "Cameron", "Dakota", "Skylar", "Blake", "Sage", "River", "Phoenix",
         "Emma", "Liam", "Olivia", "Noah", "Ava", "Ethan", "Sophia", "Mason",
@@ -23,9 +29,9 @@ class GraphGenerator:
         "Elizabeth", "Aiden", "Sofia", "Joseph", "Avery", "David", "Ella", "Jackson",
         "Madison", "Logan", "Scarlett", "John", "Victoria", "Luke", "Aria", "Jack",
         "Grace", "Owen", "Chloe", "Wyatt", "Penelope", "Carter", "Layla", "Julian"
-    ]
+    )
     
-    LAST_NAMES = [
+    LAST_NAMES = (
         "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
         "Rodriguez", "Martinez", "Hernandez", "Lopez", "Wilson", "Anderson", "Thomas", "Taylor",
         "Moore", "Jackson", "Martin", "Lee", "Thompson", "White", "Harris", "Sanchez",
@@ -33,62 +39,92 @@ class GraphGenerator:
         "Wright", "Scott", "Torres", "Nguyen", "Hill", "Flores", "Green", "Adams",
         "Nelson", "Baker", "Hall", "Rivera", "Campbell", "Mitchell", "Carter", "Roberts",
         "Gomez", "Phillips", "Evans", "Turner", "Diaz", "Parker", "Cruz", "Edwards"
-    ]
+    )
     
     def __init__(self):
         """Initialize graph generator."""
         self.graph = nx.DiGraph()
         self.clustering = ClusteringManager(
             config.NUM_REGIONS,
-            config.TOTAL_INTEREST_CATEGORIES
+            config.TOTAL_INTEREST_CATEGORIES,
+            seed=component_seed(CLUSTERING_STREAM)
         )
         self.start_date = datetime.strptime(config.START_DATE, "%Y-%m-%d")
+        self.rng = np.random.default_rng(component_seed(GRAPH_GENERATOR_STREAM))
     
-    def _generate_random_name(self) -> str:
+    def _generate_random_names(self, count: int) -> List[str]:
         """
-        Generate a random name for a user.
+        Generate random names for a batch of users.
         
+        Args:
+            count: Number of names to generate
+            
         Returns:
-            Random name string (first name + last name)
+            List of random name strings (first name + last name)
         """
-        first_name = random.choice(self.FIRST_NAMES)
-        last_name = random.choice(self.LAST_NAMES)
-        return f"{first_name} {last_name}"
+        first_names = self.FIRST_NAMES
+        last_names = self.LAST_NAMES
+        first_indices = self.rng.integers(0, len(first_names), size=count)
+        last_indices = self.rng.integers(0, len(last_names), size=count)
+        return [
+            f"{first_names[first]} {last_names[last]}"
+            for first, last in zip(first_indices.tolist(), last_indices.tolist())
+        ]
     
     def generate_nodes(self) -> None:
         """Generate all nodes with attributes."""
         print(f"Generating {config.NUM_NODES} nodes...")
         
-        for user_id in range(config.NUM_NODES):
-            # Assign location
-            lat, lon, region_id = self.clustering.assign_location()
-            
-            # Assign interests
-            interests = self.clustering.assign_interests(
-                config.MIN_INTERESTS_PER_USER,
-                config.MAX_INTERESTS_PER_USER
-            )
-            
-            # Assign creation date (staggered over time)
-            days_before = random.randint(
-                config.ACCOUNT_CREATION_END_DAYS_BEFORE,
-                config.ACCOUNT_CREATION_START_DAYS_BEFORE
-            )
-            created_at = self.start_date - timedelta(days=days_before)
-            
-            # Generate random name
-            name = self._generate_random_name()
-            
-            # Add node with attributes
-            self.graph.add_node(
-                user_id,
-                user_id=user_id,
-                name=name,
-                location=(lat, lon),
-                region_id=region_id,
-                interests=list(interests),  # Convert set to list for JSON serialization
-                created_at=created_at.isoformat()
+        # Draw names and creation offsets (staggered over time) for all users
+        names = self._generate_random_names(config.NUM_NODES)
+        days_before_all = self.rng.integers(
+            config.ACCOUNT_CREATION_END_DAYS_BEFORE,
+            config.ACCOUNT_CREATION_START_DAYS_BEFORE + 1,
+            size=config.NUM_NODES
+        ).tolist()
+        
+        # Assign locations for all users in one vectorized call
+        lats, lons, region_ids = self.clustering.assign_locations(config.NUM_NODES)
+        lat_list, lon_list, region_list = lats.tolist(), lons.tolist(), region_ids.tolist()
+        
+        # Assign interests for all users as an N x K flag matrix, then derive
+        # each user's interest list (in pool order) from it
+        interest_flags = self.clustering.assign_interests_batch(
+            config.NUM_NODES,
+            config.MIN_INTERESTS_PER_USER,
+            config.MAX_INTERESTS_PER_USER
+        )
+        _, interest_columns = np.nonzero(interest_flags)
+        pool = self.clustering.interest_pool
+        interest_names = [pool[i] for i in interest_columns.tolist()]
+        offsets = np.concatenate(([0], np.cumsum(interest_flags.sum(axis=1)))).tolist()
+        
+        # Creation dates repeat across users, so format each distinct one once
+        created_at_iso = {
+            days_before: (self.start_date - timedelta(days=days_before)).isoformat()
+            for days_before in set(days_before_all)
+        }
+        
+        # Add all nodes with their attributes in one call
+        self.graph.add_nodes_from(
+            (user_id, {
+                'user_id': user_id,
+                'name': name,
+                'location': (lat, lon),
+                'region_id': region_id,
+                'interests': interest_names[start:stop],
+                'created_at': created_at_iso[days_before]
+            })
+            for user_id, name, lat, lon, region_id, start, stop, days_before in zip(
+                range(config.NUM_NODES), names, lat_list, lon_list, region_list,
+                offsets, offsets[1:], days_before_all
             )
+        )
+        
+        # Encode regions and interests as arrays for vectorized edge generation
+        # (row i belongs to user_id i, which is also the node ID)
+        self.regions = region_ids.astype(np.int32)
+        self.interest_bits = interest_flags.astype(np.uint8)
         
         print(f"Generated {len(self.graph.nodes())} nodes")
     
@@ -96,75 +132,68 @@ class GraphGenerator:
         """Generate edges based on clustering and probabilities."""
         print("Generating edges...")
         
-        nodes = list(self.graph.nodes())
-        edges_created = 0
+        n = self.graph.number_of_nodes()
         
-        # Generate edges with clustering
-        for i, node1 in enumerate(nodes):
-            if (i + 1) % 100 == 0:
-                print(f"  Processed {i + 1}/{len(nodes)} nodes...")
-            
-            node1_data = self.graph.nodes[node1]
-            region1 = node1_data['region_id']
-            interests1 = set(node1_data['interests'])
-            
-            for node2 in nodes:
-                if node1 == node2:
-                    continue
-                
-                node2_data = self.graph.nodes[node2]
-                region2 = node2_data['region_id']
-                interests2 = set(node2_data['interests'])
-                
-                # Calculate connection probability
-                prob = self.clustering.calculate_connection_probability(
-                    region1, region2,
-                    interests1, interests2,
-                    config.BASE_CONNECTION_PROB,
-                    config.GEOGRAPHIC_BOOST,
-                    config.INTEREST_OVERLAP_BOOST,
-                    config.MAX_INTEREST_BOOST
-                )
-                
-                # Decide if connection should be made
-                if random.random() < prob:
-                    # Determine direction (some will be mutual, some one-way)
-                    # Higher probability of mutual if high similarity
-                    similarity = (
-                        self.clustering.calculate_geographic_similarity(region1, region2) +
-                        self.clustering.calculate_interest_similarity(interests1, interests2)
-                    ) / 2.0
-                    
-                    # Create edge from node1 to node2
-                    if random.random() < (0.3 + similarity * 0.4):  # 30-70% chance
-                        self._add_edge(node1, node2)
-                        edges_created += 1
-                    
-                    # Create edge from node2 to node1 (mutual follow)
-                    if random.random() < (0.3 + similarity * 0.4):
-                        self._add_edge(node2, node1)
-                        edges_created += 1
+        # 0/1 float32 flags so interest overlap is a BLAS matmul
+        bits = self.interest_bits.astype(np.float32)
+        interest_counts = bits.sum(axis=1)
         
-        print(f"Generated {edges_created} edges")
-        print(f"Total edges in graph: {len(self.graph.edges())}")
-    
-    def _add_edge(self, from_node: int, to_node: int) -> None:
-        """
-        Add an edge with initial attributes.
+        # Score source rows in blocks so the pairwise buffers stay
+        # O(block_rows x N) instead of O(N x N)
+        block_rows = max(1, EDGE_BLOCK_ELEMENTS // max(n, 1))
         
-        Args:
-            from_node: Source node
-            to_node: Target node
-        """
-        if not self.graph.has_edge(from_node, to_node):
-            self.graph.add_edge(
-                from_node,
-                to_node,
+        for start in range(0, n, block_rows):
+            stop = min(start + block_rows, n)
+            rows = slice(start, stop)
+            shape = (stop - start, n)
+            
+            if n > block_rows:
+                print(f"  Processed {start}/{n} nodes...")
+            
+            # Connection probability for every ordered pair in the block
+            prob, same_region, interest_sim = self.clustering.score_all_pairs(
+                self.regions,
+                bits,
+                config.BASE_CONNECTION_PROB,
+                config.GEOGRAPHIC_BOOST,
+                config.INTEREST_OVERLAP_BOOST,
+                config.MAX_INTEREST_BOOST,
+                rows=rows,
+                interest_counts=interest_counts
+            )
+            
+            # Decide which pairs connect (never a node with itself)
+            connect = self.rng.random(shape, dtype=np.float32) < prob
+            connect[np.arange(stop - start), np.arange(start, stop)] = False
+            
+            # Determine direction (some will be mutual, some one-way)
+            # Higher probability of mutual if high similarity (30-70% chance):
+            # 0.3 + 0.4 * (geo + interest) / 2, computed into the prob buffer
+            direction_prob = np.add(interest_sim, same_region, out=prob)
+            direction_prob *= 0.2
+            direction_prob += 0.3
+            forward = connect & (self.rng.random(shape, dtype=np.float32) < direction_prob)
+            backward = connect & (self.rng.random(shape, dtype=np.float32) < direction_prob)
+            
+            # forward[i, j] creates i -> j, backward[i, j] creates j -> i
+            forward_rows, forward_cols = np.nonzero(forward)
+            backward_rows, backward_cols = np.nonzero(backward)
+            sources = np.concatenate((forward_rows + start, backward_cols)).tolist()
+            targets = np.concatenate((forward_cols, backward_rows + start)).tolist()
+            
+            # Insert the block's edges in one call; rows are node IDs, so the
+            # index pairs are the edges. NetworkX copies the shared attributes
+            # into a fresh dict per edge, and an edge produced twice (from
+            # both endpoints' rows) is simply kept once
+            self.graph.add_edges_from(
+                zip(sources, targets),
                 message_count=0,
                 last_interaction=None,
                 established_at=self.start_date.isoformat(),
                 relationship_type="fan"  # Will be updated later
             )
+        
+        print(f"Generated {self.graph.number_of_edges()} edges")
     
     def get_graph(self) -> nx.DiGraph:
         """Get the generated graph."""
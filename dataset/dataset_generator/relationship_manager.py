@@ -3,7 +3,8 @@ Manages friend/fan relationships and distance calculations.
 """
 
 import networkx as nx
-from typing import Dict, Tuple, Set
+import numpy as np
+from typing import Dict, FrozenSet, Tuple, Set
 import config
 
 
@@ -18,6 +19,14 @@ class RelationshipManager:
             graph: Directed graph representing the social network
         """
         self.graph = graph
+        
+        # Distance weights, read from config once instead of on every edge
+        self._base_distances = {
+            "friend": config.FRIEND_BASE_DISTANCE,
+            "fan": config.FAN_BASE_DISTANCE
+        }
+        self._mutual_friend_weight = config.MUTUAL_FRIEND_WEIGHT
+        self._message_freq_weight = config.MESSAGE_FREQ_WEIGHT
     
     def get_relationship_type(self, node1: int, node2: int) -> str:
         """
@@ -30,8 +39,9 @@ class RelationshipManager:
         Returns:
             "friend" if mutual, "fan" if one-way, None if no connection
         """
-        has_edge_1_to_2 = self.graph.has_edge(node1, node2)
-        has_edge_2_to_1 = self.graph.has_edge(node2, node1)
+        succ = self.graph._succ
+        has_edge_1_to_2 = node2 in succ.get(node1, ())
+        has_edge_2_to_1 = node1 in succ.get(node2, ())
         
         if has_edge_1_to_2 and has_edge_2_to_1:
             return "friend"
@@ -51,22 +61,36 @@ class RelationshipManager:
         Returns:
             Set of mutual friend node IDs
         """
-        # Get followers of node1 (who node1 follows)
-        followers_1 = set(self.graph.successors(node1))
-        
-        # Get followers of node2 (who node2 follows)
-        followers_2 = set(self.graph.successors(node2))
+        succ = self.graph._succ
+        pred = self.graph._pred
         
         # Mutual friends: nodes that both node1 and node2 follow
         # AND who follow back both node1 and node2
-        mutual = set()
-        for node in followers_1 & followers_2:
-            if (self.graph.has_edge(node, node1) and 
-                self.graph.has_edge(node, node2)):
-                mutual.add(node)
+        mutual = succ[node1].keys() & succ[node2].keys()
+        mutual &= pred[node1].keys()
+        mutual &= pred[node2].keys()
         
         return mutual
     
+    def get_friend_sets(self) -> Dict[int, FrozenSet[int]]:
+        """
+        Snapshot every node's friends (mutual connections) in one pass.
+        
+        A mutual friend of node1 and node2 is a node that both follow and
+        that follows both back, i.e. a member of both friend sets. Building
+        the sets once lets a pass over all edges count mutual friends with a
+        single set intersection per edge.
+        
+        Returns:
+            Dictionary mapping node ID to the frozenset of its friends
+        """
+        succ = self.graph._succ
+        pred = self.graph._pred
+        return {
+            node: frozenset(succ[node].keys() & pred[node].keys())
+            for node in self.graph
+        }
+    
     def calculate_distance(
         self,
         node1: int,
@@ -85,11 +109,8 @@ class RelationshipManager:
             Distance value (lower = closer)
         """
         # Get base distance based on relationship type
-        if relationship_type == "friend":
-            base_distance = config.FRIEND_BASE_DISTANCE
-        elif relationship_type == "fan":
-            base_distance = config.FAN_BASE_DISTANCE
-        else:
+        base_distance = self._base_distances.get(relationship_type)
+        if base_distance is None:
             return float('inf')  # No connection
         
         # Count mutual friends
@@ -97,11 +118,10 @@ class RelationshipManager:
         mutual_friend_count = len(mutual_friends)
         
         # Get message count (normalized)
-        edge_data = None
-        if self.graph.has_edge(node1, node2):
-            edge_data = self.graph[node1][node2]
-        elif self.graph.has_edge(node2, node1):
-            edge_data = self.graph[node2][node1]
+        succ = self.graph._succ
+        edge_data = succ[node1].get(node2)
+        if edge_data is None:
+            edge_data = succ[node2].get(node1)
         
         message_count = edge_data.get('message_count', 0) if edge_data else 0
         # Normalize message count (assuming max ~1000 messages)
@@ -109,33 +129,109 @@ class RelationshipManager:
         
         # Calculate distance
         distance = (base_distance - 
-                   (mutual_friend_count * config.MUTUAL_FRIEND_WEIGHT) -
-                   (message_freq * config.MESSAGE_FREQ_WEIGHT * 10))
+                   (mutual_friend_count * self._mutual_friend_weight) -
+                   (message_freq * self._message_freq_weight * 10))
         
         # Ensure minimum distance
         return max(0.1, distance)
     
+    def calculate_distances(
+        self,
+        is_friend: np.ndarray,
+        mutual_friend_counts: np.ndarray,
+        message_counts: np.ndarray
+    ) -> np.ndarray:
+        """
+        Calculate distances for many connected pairs at once.
+        
+        Vectorized version of calculate_distance for pairs that are known to
+        be connected.
+        
+        Args:
+            is_friend: Whether each pair is a friend (else fan) relationship
+            mutual_friend_counts: Number of mutual friends of each pair
+            message_counts: Message count of each pair
+            
+        Returns:
+            Array of distance values (lower = closer)
+        """
+        base_distance = np.where(
+            is_friend, self._base_distances["friend"], self._base_distances["fan"]
+        )
+        
+        # Normalize message count (assuming max ~1000 messages)
+        message_freq = np.minimum(message_counts / 1000.0, 1.0)
+        
+        distance = (base_distance -
+                    (mutual_friend_counts * self._mutual_friend_weight) -
+                    (message_freq * self._message_freq_weight * 10))
+        
+        # Ensure minimum distance
+        return np.maximum(distance, 0.1)
+    
     def update_all_distances(self):
         """Update distance attribute for all edges in the graph."""
-        for edge in self.graph.edges():
-            node1, node2 = edge
-            relationship_type = self.get_relationship_type(node1, node2)
-            
-            if relationship_type:
-                distance = self.calculate_distance(node1, node2, relationship_type)
+        succ = self.graph._succ
+        friend_sets = self.get_friend_sets()
+        
+        # Gather each pair's inputs in one pass over the adjacency dicts,
+        # then compute every distance in a single vectorized call
+        forward_edges = []
+        reverse_edges = []
+        mutual_friend_counts = []
+        message_counts = []
+        
+        for node1, neighbors in succ.items():
+            friends1 = friend_sets[node1]
+            for node2, edge_data in neighbors.items():
+                reverse_data = succ[node2].get(node1)
+                
+                # Score each friend pair once, from its higher-ID side, and
+                # set the distance on both directions
+                if reverse_data is not None and node1 < node2:
+                    continue
                 
-                # Update both directions if they exist
-                if self.graph.has_edge(node1, node2):
-                    self.graph[node1][node2]['distance'] = distance
-                if self.graph.has_edge(node2, node1):
-                    self.graph[node2][node1]['distance'] = distance
+                forward_edges.append(edge_data)
+                reverse_edges.append(reverse_data)
+                mutual_friend_counts.append(len(friends1 & friend_sets[node2]))
+                message_counts.append(edge_data.get('message_count', 0))
+        
+        distances = self.calculate_distances(
+            np.array([reverse_data is not None for reverse_data in reverse_edges], dtype=bool),
+            np.array(mutual_friend_counts, dtype=np.float64),
+            np.array(message_counts, dtype=np.float64)
+        )
+        
+        for edge_data, reverse_data, distance in zip(forward_edges, reverse_edges, distances.tolist()):
+            edge_data['distance'] = distance
+            if reverse_data is not None:
+                reverse_data['distance'] = distance
     
     def update_relationship_types(self):
         """Update relationship_type attribute for all edges."""
-        for edge in list(self.graph.edges()):
-            node1, node2 = edge
-            relationship_type = self.get_relationship_type(node1, node2)
-            
-            if relationship_type:
-                self.graph[node1][node2]['relationship_type'] = relationship_type
-
+        succ = self.graph._succ
+        
+        # Every edge is visited, so each direction sets only its own type
+        for node1, neighbors in succ.items():
+            for node2, edge_data in neighbors.items():
+                if node1 in succ[node2]:
+                    edge_data['relationship_type'] = "friend"
+                else:
+                    edge_data['relationship_type'] = "fan"
+    
+    def refresh_relationship_type(self, node1: int, node2: int) -> None:
+        """
+        Update the cached relationship_type on both directions of a pair.
+        
+        Call after adding or removing an edge between node1 and node2 so the
+        edge attributes stay in sync without rescanning the whole graph.
+        
+        Args:
+            node1: First node ID
+            node2: Second node ID
+        """
+        relationship_type = self.get_relationship_type(node1, node2)
+        succ = self.graph._succ
+        for edge_data in (succ[node1].get(node2), succ[node2].get(node1)):
+            if edge_data is not None:
+                edge_data['relationship_type'] = relationship_type
@@ -0,0 +1,29 @@
+"""
+Seeding helpers giving each generator component its own random stream.
+"""
+
+import numpy as np
+import config
+
+
+# Child stream of config.SEED used by each component
+CLUSTERING_STREAM = 0
+GRAPH_GENERATOR_STREAM = 1
+TIME_EVOLUTION_STREAM = 2
+
+
+def component_seed(stream: int) -> np.random.SeedSequence:
+    """
+    Derive a component's seed sequence from config.SEED.
+    
+    This is the stream-th child of np.random.SeedSequence(config.SEED), so
+    components seeded from the same SEED draw independent numbers instead of
+    replaying one stream.
+    
+    Args:
+        stream: Component stream ID (one of the *_STREAM constants)
+        
+    Returns:
+        Seed sequence for np.random.default_rng or ClusteringManager
+    """
+    return np.random.SeedSequence(config.SEED, spawn_key=(stream,))
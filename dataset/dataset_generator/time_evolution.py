@@ -3,11 +3,17 @@ Time evolution module for daily snapshots and attribute updates.
 """
 
 import networkx as nx
-import random
+import numpy as np
 from datetime import datetime, timedelta
-from typing import List, Dict
+from itertools import compress
+from typing import List, Dict, Optional
 import config
 from dataset_generator.relationship_manager import RelationshipManager
+from dataset_generator.seeding import TIME_EVOLUTION_STREAM, component_seed
+
+
+# Random draws tried before scanning all nodes for a new fan
+NEW_FAN_SAMPLE_ATTEMPTS = 8
 
 
 class TimeEvolution:
@@ -24,7 +30,11 @@ class TimeEvolution:
         self.graph = graph.copy()
         self.start_date = start_date
         self.current_date = start_date
+        self._today_iso = start_date.isoformat()
+        self.rng = np.random.default_rng(component_seed(TIME_EVOLUTION_STREAM))
         self.relationship_manager = RelationshipManager(self.graph)
+        # Cache relationship types on edges; kept up to date incrementally
+        self.relationship_manager.update_relationship_types()
         self.viral_nodes = self._select_viral_nodes()
     
     def _select_viral_nodes(self) -> List[int]:
@@ -38,6 +48,8 @@ class TimeEvolution:
     def evolve_one_day(self) -> None:
         """Evolve graph state by one day."""
         self.current_date += timedelta(days=1)
+        # Format the date once; reused by every edge touched today
+        self._today_iso = self.current_date.isoformat()
         
         # Update message counts
         self._update_message_counts()
@@ -48,67 +60,100 @@ class TimeEvolution:
         # Update popular node dynamics
         self._update_popular_nodes()
         
-        # Update relationship types and distances
-        self.relationship_manager.update_relationship_types()
+        # Update distances (relationship types are maintained incrementally)
         self.relationship_manager.update_all_distances()
     
     def _update_message_counts(self) -> None:
         """Increment message counts for active edges."""
-        for edge in list(self.graph.edges()):
-            if random.random() < config.DAILY_MESSAGE_INCREMENT_PROB:
-                message_increment = random.randint(
-                    config.MIN_MESSAGES_PER_DAY,
-                    config.MAX_MESSAGES_PER_DAY
-                )
-                self.graph[edge[0]][edge[1]]['message_count'] += message_increment
-                self.graph[edge[0]][edge[1]]['last_interaction'] = self.current_date.isoformat()
+        # Draw activity and increments for all edges at once
+        active = self.rng.random(self.graph.number_of_edges()) < config.DAILY_MESSAGE_INCREMENT_PROB
+        message_increments = self.rng.integers(
+            config.MIN_MESSAGES_PER_DAY,
+            config.MAX_MESSAGES_PER_DAY + 1,
+            size=int(active.sum())
+        )
+        
+        # Walk the live edge view, keeping only the active edges
+        edge_data = (data for _, _, data in self.graph.edges(data=True))
+        for data, message_increment in zip(compress(edge_data, active.tolist()),
+                                           message_increments.tolist()):
+            data['message_count'] += message_increment
+            data['last_interaction'] = self._today_iso
     
     def _update_relationships(self) -> None:
         """Update relationships (friend ↔ fan, new connections, broken connections)."""
         edges_to_remove = []
         edges_to_add = []
         
-        # Check existing edges for relationship changes
-        for edge in list(self.graph.edges()):
-            node1, node2 = edge
-            relationship_type = self.relationship_manager.get_relationship_type(node1, node2)
-            
+        # Raw adjacency dicts: `v in succ[u]` is has_edge without the call
+        succ = self.graph._succ
+        
+        # Draw all per-edge random numbers at once
+        num_edges = self.graph.number_of_edges()
+        change_draws = self.rng.random(num_edges)
+        direction_draws = self.rng.random(num_edges)
+        break_draws = self.rng.random(num_edges)
+        
+        # Only edges where at least one event fires need to be inspected
+        max_change_prob = max(config.FRIEND_TO_FAN_PROB, config.FAN_TO_FRIEND_PROB)
+        candidates = (
+            (change_draws < max_change_prob) |
+            (break_draws < config.BREAK_CONNECTION_PROB)
+        )
+        
+        # Check existing edges for relationship changes (the graph is only
+        # modified after this loop, so the live edge view is safe to walk).
+        # The candidates' draws are pulled out as plain floats up front so
+        # the loop never indexes numpy arrays element by element
+        candidate_edges = compress(self.graph.edges(data='relationship_type'), candidates.tolist())
+        candidate_draws = zip(
+            change_draws[candidates].tolist(),
+            direction_draws[candidates].tolist(),
+            break_draws[candidates].tolist()
+        )
+        for (node1, node2, relationship_type), (change_draw, direction_draw, break_draw) in zip(
+            candidate_edges, candidate_draws
+        ):
             if relationship_type == "friend":
                 # Friend → Fan (one person unfollows)
-                if random.random() < config.FRIEND_TO_FAN_PROB:
+                if change_draw < config.FRIEND_TO_FAN_PROB:
                     # Randomly choose which direction to remove
-                    if random.random() < 0.5:
+                    if direction_draw < 0.5:
                         edges_to_remove.append((node1, node2))
                     else:
                         edges_to_remove.append((node2, node1))
             
             elif relationship_type == "fan":
                 # Fan → Friend (mutual follow established)
-                if random.random() < config.FAN_TO_FRIEND_PROB:
+                if change_draw < config.FAN_TO_FRIEND_PROB:
                     # Add reverse edge if it doesn't exist
-                    if not self.graph.has_edge(node2, node1):
+                    if node1 not in succ[node2]:
                         edges_to_add.append((node2, node1))
             
             # Break connection
-            if random.random() < config.BREAK_CONNECTION_PROB:
+            if break_draw < config.BREAK_CONNECTION_PROB:
                 edges_to_remove.append((node1, node2))
         
         # Remove broken connections
         for edge in edges_to_remove:
-            if self.graph.has_edge(edge[0], edge[1]):
-                self.graph.remove_edge(edge[0], edge[1])
+            if edge[1] in succ[edge[0]]:
+                self._remove_edge(edge[0], edge[1])
         
         # Add new connections
         nodes = list(self.graph.nodes())
-        for _ in range(int(len(nodes) * config.NEW_CONNECTION_PROB)):
-            node1, node2 = random.sample(nodes, 2)
-            if not self.graph.has_edge(node1, node2):
+        num_new = int(len(nodes) * config.NEW_CONNECTION_PROB)
+        sources = self.rng.integers(0, len(nodes), size=num_new)
+        # A non-zero offset guarantees two distinct nodes per pair
+        targets = (sources + self.rng.integers(1, len(nodes), size=num_new)) % len(nodes)
+        for source, target in zip(sources.tolist(), targets.tolist()):
+            node1, node2 = nodes[source], nodes[target]
+            if node2 not in succ[node1]:
                 self._add_new_edge(node1, node2)
                 edges_to_add.append((node1, node2))
         
         # Add new edges
         for edge in edges_to_add:
-            if not self.graph.has_edge(edge[0], edge[1]):
+            if edge[1] not in succ[edge[0]]:
                 self._add_new_edge(edge[0], edge[1])
     
     def _add_new_edge(self, from_node: int, to_node: int) -> None:
@@ -118,41 +163,83 @@ class TimeEvolution:
             to_node,
             message_count=0,
             last_interaction=None,
-            established_at=self.current_date.isoformat(),
+            established_at=self._today_iso,
             relationship_type="fan"
         )
+        self.relationship_manager.refresh_relationship_type(from_node, to_node)
+    
+    def _remove_edge(self, from_node: int, to_node: int) -> None:
+        """Remove an edge and update the reverse edge's relationship type."""
+        self.graph.remove_edge(from_node, to_node)
+        self.relationship_manager.refresh_relationship_type(from_node, to_node)
     
     def _update_popular_nodes(self) -> None:
         """Update fan counts for popular nodes."""
         nodes = list(self.graph.nodes())
         
-        for node in nodes:
-            is_viral = node in self.viral_nodes
+        # Per-node probabilities, with viral rows using the viral rates
+        viral_nodes = set(self.viral_nodes)
+        is_viral = np.fromiter(
+            (node in viral_nodes for node in nodes),
+            dtype=bool,
+            count=len(nodes)
+        )
+        gain_probs = np.where(is_viral, config.VIRAL_GAIN_FANS_PROB, config.NORMAL_GAIN_FANS_PROB)
+        lose_probs = np.where(is_viral, config.VIRAL_LOSE_FANS_PROB, config.NORMAL_LOSE_FANS_PROB)
+        
+        gains = self.rng.random(len(nodes)) < gain_probs
+        losses = self.rng.random(len(nodes)) < lose_probs
+        
+        selected = np.flatnonzero(gains | losses)
+        for index, gain, loss in zip(selected.tolist(),
+                                     gains[selected].tolist(),
+                                     losses[selected].tolist()):
+            node = nodes[index]
             
             # Gain fans
-            gain_prob = config.VIRAL_GAIN_FANS_PROB if is_viral else config.NORMAL_GAIN_FANS_PROB
-            if random.random() < gain_prob:
-                # Find potential new fans (nodes not already following)
-                potential_fans = [
-                    n for n in nodes 
-                    if n != node and not self.graph.has_edge(n, node)
-                ]
-                if potential_fans:
-                    new_fan = random.choice(potential_fans)
+            if gain:
+                new_fan = self._sample_new_fan(node, nodes)
+                if new_fan is not None:
                     self._add_new_edge(new_fan, node)
             
             # Lose fans
-            lose_prob = config.VIRAL_LOSE_FANS_PROB if is_viral else config.NORMAL_LOSE_FANS_PROB
-            if random.random() < lose_prob:
+            if loss:
                 # Find current fans (nodes following this node)
-                current_fans = [n for n in self.graph.predecessors(node)]
+                # (adjacency dict keyed by fan, values are the edge data)
+                current_fans = self.graph._pred[node]
                 if current_fans:
-                    lost_fan = random.choice(current_fans)
-                    if self.graph.has_edge(lost_fan, node):
-                        # Only remove if it's a fan relationship (not mutual)
-                        relationship = self.relationship_manager.get_relationship_type(lost_fan, node)
-                        if relationship == "fan":
-                            self.graph.remove_edge(lost_fan, node)
+                    fans = list(current_fans)
+                    lost_fan = fans[self.rng.integers(len(fans))]
+                    # Only remove if it's a fan relationship (not mutual)
+                    if current_fans[lost_fan]['relationship_type'] == "fan":
+                        self._remove_edge(lost_fan, node)
+    
+    def _sample_new_fan(self, node: int, nodes: List[int]) -> Optional[int]:
+        """
+        Pick a random node that does not already follow the given node.
+        
+        Uses rejection sampling, so the common case costs a few dict lookups
+        instead of a scan over all nodes. Falls back to the full scan only
+        when the node is already followed by almost everyone.
+        
+        Args:
+            node: Node gaining a fan
+            nodes: All nodes in the graph
+            
+        Returns:
+            New fan node ID, or None if every other node already follows
+        """
+        followers = self.graph._pred[node]
+        for index in self.rng.integers(0, len(nodes), size=NEW_FAN_SAMPLE_ATTEMPTS).tolist():
+            candidate = nodes[index]
+            if candidate != node and candidate not in followers:
+                return candidate
+        
+        # Find potential new fans (nodes not already following)
+        potential_fans = [n for n in nodes if n != node and n not in followers]
+        if potential_fans:
+            return potential_fans[self.rng.integers(len(potential_fans))]
+        return None
     
     def get_current_graph(self) -> nx.DiGraph:
         """Get current graph state."""
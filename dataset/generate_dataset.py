@@ -39,59 +39,56 @@ def main():
     # Step 3: Initialize exporter
     exporter = DataExporter()
     
-    # Step 4: Generate daily snapshots
-    print(f"\n[Step 3] Generating {config.NUM_DAYS} daily snapshots...")
-    all_nodes_data = []
-    all_edges_data = []
-    
-    for day in range(config.NUM_DAYS):
-        if (day + 1) % 10 == 0 or day == 0:
-            print(f"  Day {day + 1}/{config.NUM_DAYS} ({evolution.get_current_date().strftime('%Y-%m-%d')})...")
-        
-        # Export current snapshot
-        current_graph = evolution.get_current_graph()
-        current_date = evolution.get_current_date()
-        
-        if config.EXPORT_JSON:
-            exported = exporter.export_daily_snapshot(current_graph, current_date)
-            if day == 0:
-                print(f"    Exported to: {exported['nodes']}")
-        
-        # Collect data for aggregated CSV
+    # Writers stay open across days; the finally block guarantees pending
+    # snapshots finish and every file is flushed and closed (Parquet needs
+    # its footer to be readable) even if a day fails part way
+    try:
         if config.EXPORT_CSV:
-            for node_id, node_data in current_graph.nodes(data=True):
-                all_nodes_data.append({
-                    'user_id': node_id,
-                    'name': node_data.get('name', ''),
-                    'date': current_date.isoformat(),
-                    'location_lat': node_data.get('location', (0, 0))[0],
-                    'location_lon': node_data.get('location', (0, 0))[1],
-                    'region_id': node_data.get('region_id', 0),
-                    'interests': ','.join(node_data.get('interests', [])),
-                    'created_at': node_data.get('created_at', '')
-                })
+            exporter.open_aggregated_csv()
+        if config.EXPORT_PARQUET:
+            exporter.open_aggregated_parquet()
+            
+        # Step 4: Generate daily snapshots
+        print(f"\n[Step 3] Generating {config.NUM_DAYS} daily snapshots...")
+        
+        for day in range(config.NUM_DAYS):
+            if (day + 1) % 10 == 0 or day == 0:
+                print(f"  Day {day + 1}/{config.NUM_DAYS} ({evolution.get_current_date().strftime('%Y-%m-%d')})...")
+            
+            # Export current snapshot
+            current_graph = evolution.get_current_graph()
+            current_date = evolution.get_current_date()
+            
+            if config.EXPORT_JSON:
+                exported = exporter.export_daily_snapshot(
+                    current_graph,
+                    current_date,
+                    background=config.EXPORT_IN_BACKGROUND
+                )
+                if day == 0:
+                    print(f"    Exported to: {exported['nodes']}")
+            
+            # Append this day's rows to the aggregated CSV/Parquet files
+            if config.EXPORT_CSV:
+                exporter.append_daily_csv(current_graph, current_date)
+            if config.EXPORT_PARQUET:
+                exporter.append_daily_parquet(current_graph, current_date)
             
-            for source, target, edge_data in current_graph.edges(data=True):
-                all_edges_data.append({
-                    'date': current_date.isoformat(),
-                    'source': source,
-                    'target': target,
-                    'relationship_type': edge_data.get('relationship_type', 'fan'),
-                    'message_count': edge_data.get('message_count', 0),
-                    'last_interaction': edge_data.get('last_interaction', ''),
-                    'distance': edge_data.get('distance', 0.0),
-                    'established_at': edge_data.get('established_at', '')
-                })
+            # Evolve to next day (except on last iteration)
+            if day < config.NUM_DAYS - 1:
+                evolution.evolve_one_day()
         
-        # Evolve to next day (except on last iteration)
-        if day < config.NUM_DAYS - 1:
-            evolution.evolve_one_day()
+    finally:
+        try:
+            exporter.wait_for_snapshots()
+        finally:
+            exporter.close_aggregated_csv()
+            exporter.close_aggregated_parquet()
     
-    # Step 5: Export aggregated CSV files
     if config.EXPORT_CSV:
-        print("\n[Step 4] Exporting aggregated CSV files...")
-        exporter.export_aggregated_csv(all_nodes_data, all_edges_data)
         print(f"    Exported nodes.csv and edges_daily.csv to {config.OUTPUT_DIR}")
+    if config.EXPORT_PARQUET:
+        print(f"    Exported nodes.parquet and edges_daily.parquet to {config.OUTPUT_DIR}")
     
     print("\n" + "=" * 60)
     print("Dataset generation complete!")
@@ -102,6 +99,8 @@ def main():
         print(f"  - JSON format: {config.OUTPUT_DIR}/YYYY-MM-DD/nodes.json, edges.json, metadata.json")
     if config.EXPORT_CSV:
         print(f"  - CSV format: {config.OUTPUT_DIR}/nodes.csv, edges_daily.csv")
+    if config.EXPORT_PARQUET:
+        print(f"  - Parquet format: {config.OUTPUT_DIR}/nodes.parquet, edges_daily.parquet")
 
 
 if __name__ == "__main__":